@@ -26,7 +26,9 @@ def build_mixed_trainval(pipelines, dataset_source, dataset_group):
     mixed = pd.concat(long_frames, ignore_index=True)
 
     num_series = mixed["unique_id"].nunique()
-    avg_time_points = mixed.groupby("unique_id", observed=True).size().mean()
+    avg_time_points = (
+        mixed.groupby("unique_id", sort=False, observed=True).size().mean()
+    )
 
     print(f"Dataset Summary for {dataset_source} ({dataset_group}):")
     print(f"   - Total number of time series: {num_series}")
@@ -52,6 +54,7 @@ class DataPipeline:
         patience: int = 30,
         horizon: int = 24,
         window_size: int = 24,
+        seed: int = 0,
     ):
         self.dataset_name = dataset_name
         self.dataset_group = dataset_group
@@ -62,19 +65,28 @@ class DataPipeline:
         self.forecasting = forecasting
         self.patience = patience
         self.kernel_size = kernel_size
+        # one seeded generator for the whole pipeline, so a cache miss
+        # recreates the same train/val/test split
+        self._rng = np.random.default_rng(seed)
         (self.data, self.s, self.freq) = self.load_data(
             self.dataset_name, self.dataset_group
         )
         self.s_train = None
         self.y = self.data
         self.n = self.data.shape[0]
-        self.df = pd.DataFrame(self.data)
-        # self.df.asfreq(self.freq)
+        # loaders already return a long DataFrame, so avoid re-wrapping it
+        self.df = (
+            self.data
+            if isinstance(self.data, pd.DataFrame)
+            else pd.DataFrame(self.data)
+        )
         self.h = horizon
         self.window_size = window_size
 
         num_series = self.df["unique_id"].nunique()
-        avg_time_points = self.df.groupby("unique_id", observed=True).size().mean()
+        avg_time_points = (
+            self.df.groupby("unique_id", sort=False, observed=True).size().mean()
+        )
 
         print(f"Dataset Summary for {dataset_name} ({dataset_group}):")
         print(f"   - Total number of time series: {num_series}")
@@ -102,7 +114,6 @@ class DataPipeline:
         self._feature_engineering_basic_forecast()
         feature_dict = self._feature_engineering()
 
-        self.original_long = feature_dict["original_long"]
         self.original_train_long = feature_dict["train_long"]
         self.original_val_long = feature_dict["val_long"]
         self.original_trainval_long = feature_dict["trainval_long"]
@@ -122,7 +133,7 @@ class DataPipeline:
             print(f"Error loading data for {dataset_name} - {group}: {e}")
 
         freq = data_cls.frequency_pd[group]
-        n_series = int(ds.nunique()["unique_id"])
+        n_series = int(ds["unique_id"].nunique())
         return ds, n_series, freq
 
     def check_series_in_train_test(
@@ -131,7 +142,9 @@ class DataPipeline:
         train_ids,
         test_ids,
     ):
-        series_to_check = self.df.loc[self.df["ds"] == date, "unique_id"].unique()
+        series_to_check = self.original_long.loc[
+            self.original_long["ds"] == date, "unique_id"
+        ].unique()
 
         in_train = np.intersect1d(train_ids, series_to_check)
 
@@ -162,13 +175,28 @@ class DataPipeline:
                 )
 
         val_size = int(len(self.unique_ids) * val_split)
-        np.random.shuffle(self.unique_ids)
+        # shuffle a permutation index rather than self.unique_ids in place, so
+        # the ids stay sorted; the pipeline's generator leaves the global RNG alone
+        shuffled_ids = self.unique_ids[self._rng.permutation(len(self.unique_ids))]
         train_size = int(len(self.unique_ids) * (1 - val_split) * train_test_split)
 
-        train_ids = self.unique_ids[:train_size]
-        val_ids = self.unique_ids[train_size : train_size + val_size]
-        test_ids = self.unique_ids[train_size + val_size :]
+        train_ids = shuffled_ids[:train_size]
+        val_ids = shuffled_ids[train_size : train_size + val_size]
+        test_ids = shuffled_ids[train_size + val_size :]
+
+        # ensuring that we have in the training set at least one series
+        # that starts with the min date
+        ds_min = self.original_long["ds"].min()
+        ds_max = self.original_long["ds"].max()
+
+        train_ids, test_ids = self.check_series_in_train_test(
+            ds_min, train_ids, test_ids
+        )
+        train_ids, test_ids = self.check_series_in_train_test(
+            ds_max, train_ids, test_ids
+        )
 
+        # save the adjusted split, so later runs load the same one this run uses
         os.makedirs(os.path.dirname(self.split_path), exist_ok=True)
         with open(self.split_path, "w") as f:
             json.dump(
@@ -180,18 +208,6 @@ class DataPipeline:
                 f,
             )
 
-        # ensuring that we have in the training set at least one series
-        # that starts with the min date
-        ds_min = self.df["ds"].min()
-        ds_max = self.df["ds"].max()
-
-        train_ids, test_ids = self.check_series_in_train_test(
-            ds_min, train_ids, test_ids
-        )
-        train_ids, test_ids = self.check_series_in_train_test(
-            ds_max, train_ids, test_ids
-        )
-
         return train_ids.tolist(), val_ids.tolist(), test_ids.tolist()
 
     @staticmethod
@@ -242,18 +258,6 @@ class DataPipeline:
         # dividing days by 7 => fractional weeks
         return (dates - d0).days / 7.0
 
-    @staticmethod
-    def _skip_short_series(df_long: pd.DataFrame, min_length: int) -> pd.DataFrame:
-        """
-        keep only the series that have >= min_length points.
-        """
-        lengths = df_long.groupby("unique_id")["ds"].count()
-
-        valid_ids = lengths[lengths >= min_length].index
-
-        df_filtered = df_long[df_long["unique_id"].isin(valid_ids)].copy()
-        return df_filtered
-
     def _feature_engineering(
         self, train_test_split=0.7, val_split=0.15
     ) -> Dict[str, pd.DataFrame]:
@@ -261,11 +265,18 @@ class DataPipeline:
         Apply preprocessing to raw time series, split into training, validation, and testing,
         """
         cache_dir = Path("assets/processed_datasets")
-        cache_dir.mkdir(parents=True, exist_ok=True)
         cache_path = (
             cache_dir / f"{self.dataset_name}_{self.dataset_group}_features.pkl"
         )
 
+        # original_long is not stored in the cache, so build it (with string
+        # ids) whether or not the cache is warm; the copy leaves the loader's
+        # frame in self.df untouched
+        original_long = self.df.copy()
+        if isinstance(original_long["unique_id"].dtype, CategoricalDtype):
+            original_long["unique_id"] = original_long["unique_id"].astype(str)
+        self.original_long = original_long
+
         if cache_path.exists():
             print("✓ Loaded cached feature‑engineering dictionary.")
             return joblib.load(cache_path)
@@ -273,11 +284,7 @@ class DataPipeline:
         print("• Computing heavy feature‑engineering")
         min_length = self.window_size + 2 * self.h
 
-        if isinstance(self.df["unique_id"].dtype, CategoricalDtype):
-            self.df["unique_id"] = self.df["unique_id"].astype(str)
-        self.ids = np.sort(self.df["unique_id"].unique())
-
-        original_long = self.df.copy()
+        self.ids = np.sort(original_long["unique_id"].unique())
 
         self.ds_original = pd.DatetimeIndex(original_long["ds"].unique()).sort_values()
         self.unique_ids_original = sorted(original_long["unique_id"].unique())
@@ -292,39 +299,45 @@ class DataPipeline:
         self.s_train = len(self.train_ids)
         self.s_val = len(self.val_ids)
 
+        # label every row with its split and series length in one pass, instead
+        # of an isin scan plus a short-series groupby for every split
+        split_codes = {uid: 0 for uid in self.train_ids}
+        split_codes.update({uid: 1 for uid in self.val_ids})
+        split_codes.update({uid: 2 for uid in self.test_ids})
+        row_split = original_long["unique_id"].map(split_codes).to_numpy()
+
+        # keep only the series that have >= min_length points
+        lengths = original_long.groupby("unique_id", sort=False)["ds"].transform(
+            "count"
+        )
+        long_enough = (lengths >= min_length).to_numpy()
+
         ### TRAINING DATA ###
-        train_long = original_long[original_long["unique_id"].isin(self.train_ids)]
-        train_long = self._skip_short_series(train_long, min_length)
+        train_long = original_long[(row_split == 0) & long_enough]
 
         self.ds_train = pd.DatetimeIndex(train_long["ds"].unique()).sort_values()
         self.unique_ids_train = sorted(train_long["unique_id"].unique())
 
         ### VALIDATION DATA ###
-        val_long = original_long[original_long["unique_id"].isin(self.val_ids)]
-        val_long = self._skip_short_series(val_long, min_length)
+        val_long = original_long[(row_split == 1) & long_enough]
 
         self.ds_val = pd.DatetimeIndex(val_long["ds"].unique()).sort_values()
         self.unique_ids_val = sorted(val_long["unique_id"].unique())
 
         ### TRAIN + VALIDATION DATA ###
-        trainval_ids = self.train_ids + self.val_ids
-
-        trainval_long = original_long[original_long["unique_id"].isin(trainval_ids)]
-        trainval_long = self._skip_short_series(trainval_long, min_length)
+        trainval_long = original_long[(row_split <= 1) & long_enough]
 
         self.ds_trainval = pd.DatetimeIndex(trainval_long["ds"].unique()).sort_values()
         self.unique_ids_trainval = sorted(trainval_long["unique_id"].unique())
 
         ### TESTING DATA ###
-        test_long = original_long[original_long["unique_id"].isin(self.test_ids)]
-        test_long = self._skip_short_series(test_long, min_length)
+        test_long = original_long[(row_split == 2) & long_enough]
 
         self.ds_test = pd.DatetimeIndex(test_long["ds"].unique()).sort_values()
         self.unique_ids_test = sorted(test_long["unique_id"].unique())
 
         feature_dict = {
-            # long Data
-            "original_long": original_long,
+            # long Data (original_long is rebuilt from self.df, not pickled)
             "train_long": train_long,
             "val_long": val_long,
             "trainval_long": trainval_long,
@@ -339,34 +352,35 @@ class DataPipeline:
             "ds_test": self.ds_test,
         }
 
+        # the directory is only needed on a cache miss, a warm cache skips it
+        cache_dir.mkdir(parents=True, exist_ok=True)
         joblib.dump(feature_dict, cache_path)
         print(f"  → cached feature‑engineering dictionary at {cache_path.name}")
         return feature_dict
 
     @staticmethod
-    def _mark_train_val_test(group, window_size, horizon):
+    def _mark_train_val_test(df, window_size, horizon):
         """
-        Given one group of rows for a single unique_id,
-        return a Series of labels: 'train', 'val', 'test', or 'skip'.
+        Given rows sorted by unique_id and ds, return an array of labels:
+        'train', 'val', 'test', or 'skip', computed for all series at once.
         """
-        group = group.sort_values(by="ds")
-        n = len(group)
-        # we need at least window size + val_size (h) + h
-        if n < window_size + 2 * horizon:
-            # mark as skip for all rows in this group
-            return pd.Series(["skip"] * n, index=group.index)
+        grouped = df.groupby("unique_id", observed=True, sort=False)
+        position = grouped.cumcount().to_numpy()
+        n = grouped["ds"].transform("size").to_numpy()
 
-        test_start_idx = n - horizon
-        val_start_idx = n - 2 * horizon
-
-        labels = np.array(["train"] * n)  # default
-        labels[val_start_idx:test_start_idx] = "val"
-        labels[test_start_idx:] = "test"
-        return pd.Series(labels, index=group.index)
+        # we need at least window size + val_size (h) + h
+        return np.select(
+            [
+                n < window_size + 2 * horizon,
+                position >= n - horizon,
+                position >= n - 2 * horizon,
+            ],
+            ["skip", "test", "val"],
+            default="train",
+        )
 
     def _feature_engineering_basic_forecast(self):
         cache_dir = Path("assets/processed_datasets")
-        cache_dir.mkdir(parents=True, exist_ok=True)
         cache_path = (
             cache_dir / f"{self.dataset_name}_{self.dataset_group}_basic_forecast.pkl"
         )
@@ -375,12 +389,11 @@ class DataPipeline:
             basic_dict = joblib.load(cache_path)
             print("✓ Loaded cached basic‑forecast splits.")
         else:
-            df = self.df.sort_values(by=["unique_id", "ds"]).copy()
+            # sort_values already returns a new frame
+            df = self.df.sort_values(by=["unique_id", "ds"])
 
             # mark each row with its fold (train, val, test, or skip)
-            df["fold"] = df.groupby("unique_id", group_keys=False, observed=True).apply(
-                lambda g: self._mark_train_val_test(g, self.window_size, self.h)
-            )
+            df["fold"] = self._mark_train_val_test(df, self.window_size, self.h)
 
             df = df[df["fold"] != "skip"]
 
@@ -390,6 +403,7 @@ class DataPipeline:
                 "test_long": df[df["fold"] == "test"],
                 "trainval_long": df[df["fold"] != "test"],
             }
+            cache_dir.mkdir(parents=True, exist_ok=True)
             joblib.dump(basic_dict, cache_path)
             print(f"  → cached basic‑forecast splits at {cache_path.name}")
 
@@ -61,6 +61,11 @@ def cmd_parser():
         action="store_true",
         help="Perform basic forecasting.",
     )
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="Skip the predicted-vs-original plots saved for every evaluated model.",
+    )
     args = parser.parse_args()
 
     set_device(args.use_gpu)
@@ -17,7 +17,8 @@ performance_results = [
 results_combined = []
 for result in performance_results:
     csv_path = os.path.join(base_path, result)
-    df = pd.read_csv(csv_path)
+    # tuning result files carry every config column; only two are needed
+    df = pd.read_csv(csv_path, usecols=["time_total_s", "loss"])
 
     df["Dataset"] = result.split("_")[0]
     df["Group"] = result.split("_")[1]
@@ -26,13 +27,10 @@ for result in performance_results:
 
     results_combined.append(df)
 
-idx = (
-    pd.concat(results_combined, ignore_index=True)
-    .groupby(["Dataset", "Group", "Method"])["loss"]
-    .idxmin()
-)
+all_results_df = pd.concat(results_combined, ignore_index=True)
+idx = all_results_df.groupby(["Dataset", "Group", "Method"])["loss"].idxmin()
 
-min_loss_df = pd.concat(results_combined, ignore_index=True).loc[idx]
+min_loss_df = all_results_df.loc[idx]
 
 
 results_df = min_loss_df.groupby("Method")["time_total_s"].sum().reset_index()
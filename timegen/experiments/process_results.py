@@ -88,8 +88,11 @@ def apply_fm_results(base_df: pd.DataFrame, path_fm: Union[str, Path]) -> pd.Dat
             fm_df[col] = pd.NA
 
     fm_df["Dataset Source"] = "MIXED"
-    fm_df["Dataset Group Source"] = fm_df.apply(
-        lambda x: f"ALL_BUT_{x['Dataset Target']}_{x['Dataset Group Target']}", axis=1
+    fm_df["Dataset Group Source"] = (
+        "ALL_BUT_"
+        + fm_df["Dataset Target"].astype(str)
+        + "_"
+        + fm_df["Dataset Group Target"].astype(str)
     )
     fm_df = fm_df[required_columns]
 
@@ -121,7 +124,9 @@ def summarize_metric(
     if mode == "rank":
         if not rank_within:
             raise ValueError("`rank_within` must be given when mode='rank'")
-        work["Rank"] = work.groupby(rank_within)[metric].rank(method=rank_method)
+        work["Rank"] = work.groupby(rank_within, sort=False)[metric].rank(
+            method=rank_method
+        )
         summary = work.groupby(aggregate_by)["Rank"].apply(agg_func).reset_index()
         summary.rename(columns={"Rank": "Rank"}, inplace=True)
         sort_by = ["Rank"] if aggregate_by == ["Method"] else aggregate_by + ["Rank"]
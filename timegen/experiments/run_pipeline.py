@@ -11,6 +11,7 @@ from timegen.metrics.evaluation_pipeline import (
     evaluation_pipeline_timegen_forecast,
 )
 from timegen.model_pipeline.model_pipeline import ModelPipeline, ModelPipelineCoreset
+from timegen.model_pipeline.core.core_extension import CustomNeuralForecast
 from timegen.experiments.helper import (
     extract_frequency,
     extract_horizon,
@@ -72,6 +73,7 @@ if __name__ == "__main__":
     # multiprocessing.set_start_method("spawn")
 
     results = []
+    transfer_learning_model_paths = {}
 
     for DATASET, SUBGROUPS in DATASET_GROUP_FREQ.items():
         for subgroup in SUBGROUPS.items():
@@ -105,29 +107,42 @@ if __name__ == "__main__":
                         H_TL = extract_horizon(subgroup_tl)
                         DATASET_GROUP_TL = subgroup_tl[0]
 
-                        data_pipeline_transfer_learning = DataPipeline(
-                            dataset_name=DATASET_TL,
-                            dataset_group=DATASET_GROUP_TL,
-                            freq=FREQ_TL,
-                            horizon=H_TL,
-                            window_size=H_TL,
-                        )
+                        # source models do not depend on the target, so build
+                        # and tune them once; only their saved paths are kept,
+                        # so the tuned models (and their ray results) are freed
+                        source_key = (DATASET_TL, DATASET_GROUP_TL)
+                        if source_key not in transfer_learning_model_paths:
+                            data_pipeline_transfer_learning = DataPipeline(
+                                dataset_name=DATASET_TL,
+                                dataset_group=DATASET_GROUP_TL,
+                                freq=FREQ_TL,
+                                horizon=H_TL,
+                                window_size=H_TL,
+                            )
 
-                        model_pipeline_transfer_learning = ModelPipeline(
-                            data_pipeline=data_pipeline_transfer_learning
-                        )
+                            model_pipeline_transfer_learning = ModelPipeline(
+                                data_pipeline=data_pipeline_transfer_learning
+                            )
 
-                        model_pipeline_transfer_learning.hyper_tune_and_train(
-                            max_evals=20,
-                            mode="out_domain",
-                            dataset_source=DATASET_TL,
-                            dataset_group_source=DATASET_GROUP_TL,
-                        )
+                            model_pipeline_transfer_learning.hyper_tune_and_train(
+                                max_evals=20,
+                                mode="out_domain",
+                                dataset_source=DATASET_TL,
+                                dataset_group_source=DATASET_GROUP_TL,
+                            )
+                            transfer_learning_model_paths[source_key] = (
+                                model_pipeline_transfer_learning.model_paths
+                            )
+                            del (
+                                data_pipeline_transfer_learning,
+                                model_pipeline_transfer_learning,
+                            )
 
                         for (
                             model_name,
-                            model,
-                        ) in model_pipeline_transfer_learning.models.items():
+                            model_path,
+                        ) in transfer_learning_model_paths[source_key].items():
+                            model = CustomNeuralForecast.load(path=model_path)
                             row_forecast_tl = {}
 
                             evaluation_pipeline_timegen_forecast(
@@ -144,10 +159,12 @@ if __name__ == "__main__":
                                 mode="out_domain",
                                 window_size=H,
                                 window_size_source=H_TL,
+                                plot=not args.no_plots,
                             )
 
                             dataset_group_results.append(row_forecast_tl)
                             results.append(row_forecast_tl)
+                            del model
             elif args.coreset:
                 LOO_RESULTS = []
 
@@ -216,6 +233,7 @@ if __name__ == "__main__":
                             mode="out_domain",
                             window_size=target_data_pipeline.h,
                             window_size_source=target_data_pipeline.h,
+                            plot=not args.no_plots,
                         )
                         LOO_RESULTS.append(row)
             elif args.basic_forecasting:
@@ -241,6 +259,7 @@ if __name__ == "__main__":
                         window_size=H,
                         window_size_source=H,
                         mode="basic_forecasting",
+                        plot=not args.no_plots,
                     )
 
                     dataset_group_results.append(row_forecast)
@@ -268,6 +287,7 @@ if __name__ == "__main__":
                         window_size=H,
                         window_size_source=H,
                         mode="in_domain",
+                        plot=not args.no_plots,
                     )
 
                     dataset_group_results.append(row_forecast)
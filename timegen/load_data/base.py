@@ -55,9 +55,10 @@ class LoadDataset:
 
     @staticmethod
     def prune_df_by_size(df: pd.DataFrame, min_n_instances: int):
-        large_ts = df["unique_id"].value_counts() >= min_n_instances
-        large_ts_uid = large_ts[large_ts].index.tolist()
+        # per-row series length through a hash lookup, instead of a query
+        # that checks every row against a python list of ids
+        counts = df["unique_id"].map(df["unique_id"].value_counts())
 
-        df = df.query("unique_id in @large_ts_uid").reset_index(drop=True)
+        df = df[counts.to_numpy() >= min_n_instances].reset_index(drop=True)
 
         return df
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from gluonts.dataset.repository.datasets import get_dataset, dataset_names
 from timegen.load_data.base import LoadDataset
@@ -41,28 +42,32 @@ class M1Dataset(LoadDataset):
         dataset = get_dataset(f"m1_{group.lower()}", regenerate=False)
         train_list = dataset.train
 
-        df_list = []
+        # gather the raw arrays and build the long frame once instead of a
+        # small DataFrame per series followed by a concat
+        ids, dates, targets = [], [], []
         for i, series in enumerate(train_list):
-            s = pd.Series(
-                series["target"],
-                index=pd.date_range(
-                    start=series["start"].to_timestamp(),
-                    freq=series["start"].freq,
-                    periods=len(series["target"]),
-                ),
+            target = np.asarray(series["target"])
+            ds = pd.date_range(
+                start=series["start"].to_timestamp(),
+                freq=series["start"].freq,
+                periods=len(target),
             )
 
             if group == "australian_electricity_demand":
-                s = s.resample("W").sum()
-
-            s_df = s.reset_index()
-            s_df.columns = ["ds", "y"]
-            s_df["unique_id"] = f"ID{i}"
-
-            df_list.append(s_df)
-
-        df = pd.concat(df_list).reset_index(drop=True)
-        df = df[["unique_id", "ds", "y"]]
+                s = pd.Series(target, index=ds).resample("W").sum()
+                target, ds = s.to_numpy(), s.index
+
+            ids.append(f"ID{i}")
+            dates.append(ds.to_numpy())
+            targets.append(target)
+
+        df = pd.DataFrame(
+            {
+                "unique_id": np.repeat(ids, [len(t) for t in targets]),
+                "ds": np.concatenate(dates),
+                "y": np.concatenate(targets),
+            }
+        )
 
         if min_n_instances is not None:
             df = cls.prune_df_by_size(df, min_n_instances)
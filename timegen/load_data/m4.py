@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from datasetsforecast.m4 import M4
 from timegen.load_data.base import LoadDataset
@@ -44,15 +45,15 @@ class M4Dataset(LoadDataset):
         if group == "Quarterly":
             ds = ds.query('unique_id!="Q23425"').reset_index(drop=True)
 
-        unq_periods = ds["ds"].sort_values().unique()
+        # the sorted integer periods and, for every row, the position of its
+        # period among them, so each row indexes its date instead of a dict map
+        unq_periods, period_idx = np.unique(ds["ds"].to_numpy(), return_inverse=True)
 
         dates = pd.date_range(
             end="2024-03-01", periods=len(unq_periods), freq=cls.frequency_pd[group]
         )
 
-        new_ds = {k: v for k, v in zip(unq_periods, dates)}
-
-        ds["ds"] = ds["ds"].map(new_ds)
+        ds["ds"] = dates[period_idx]
 
         if min_n_instances is not None:
             ds = cls.prune_df_by_size(ds, min_n_instances)
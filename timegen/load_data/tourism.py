@@ -18,9 +18,15 @@ class TourismDataset(LoadDataset):
 
     @classmethod
     def download_and_extract(cls):
-        dataset_folder = os.path.join(cls.DATASET_PATH, cls.DIR_NAME)
-        if os.path.exists(dataset_folder):
-            print(f"Dataset already exists at {dataset_folder}. Skipping download.")
+        # the archive extracts its csv files straight into DATASET_PATH, so
+        # check for those rather than for a DIR_NAME folder that never exists
+        csv_files = [
+            os.path.join(cls.DATASET_PATH, f"{group.lower()}_{part}.csv")
+            for group in cls.frequency_pd_tourism
+            for part in ("in", "oos")
+        ]
+        if all(os.path.exists(f) for f in csv_files):
+            print(f"Dataset already exists at {cls.DATASET_PATH}. Skipping download.")
             return
 
         if not os.path.exists(cls.DATASET_PATH):
@@ -46,7 +52,6 @@ class TourismDataset(LoadDataset):
         cls.download_and_extract()
         assert group in cls.data_group
 
-        ds = {}
         train = pd.read_csv(
             os.path.join(cls.DATASET_PATH, f"{group.lower()}_in.csv"),
             header=0,
@@ -72,21 +77,25 @@ class TourismDataset(LoadDataset):
         train_set = [ts[:ts_length] for ts, ts_length in zip(train.values, meta_length)]
         test_set = [ts[:ts_length] for ts, ts_length in zip(test.values, meta_length)]
 
-        for i, idx in enumerate(train.index):
-            ds[idx] = np.concatenate([train_set[i], test_set[i]])
+        series = [np.concatenate([tr, te]) for tr, te in zip(train_set, test_set)]
+        lengths = np.array([len(x) for x in series])
 
-        max_len = np.max([len(x) for k, x in ds.items()])
+        max_len = lengths.max()
         idx = pd.date_range(
             end=pd.Timestamp("2023-11-01"),
             periods=max_len,
             freq=cls.frequency_pd[group],
+        ).to_numpy()
+
+        # every series ends on the last date, so its dates are the tail of idx;
+        # build the long frame from the arrays in one go, without a wide frame
+        df = pd.DataFrame(
+            {
+                "ds": np.concatenate([idx[max_len - n :] for n in lengths]),
+                "unique_id": np.repeat(train.index.to_numpy(), lengths),
+                "y": np.concatenate(series).astype(float),
+            }
         )
-
-        ds = {
-            k: pd.Series(series, index=idx[-len(series) :]) for k, series in ds.items()
-        }
-        df = pd.concat(ds, axis=1)
-        df = df.reset_index().melt("index").dropna().reset_index(drop=True)
-        df.columns = ["ds", "unique_id", "y"]
+        df = df.dropna().reset_index(drop=True)
 
         return df
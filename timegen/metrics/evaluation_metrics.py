@@ -6,7 +6,7 @@ def smape(y_true, y_pred):
     """
     Calculate Symmetric Mean Absolute Percentage Error (SMAPE).
     """
-    y_true, y_pred = np.array(y_true), np.array(y_pred)
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
     denominator = np.abs(y_true) + np.abs(y_pred)
     epsilon = 1e-3
     smape_value = 100 * np.mean(
@@ -1,10 +1,11 @@
 import os
 import json
 import numpy as np
+import pandas as pd
 
 from timegen.model_pipeline.model_pipeline import ModelPipeline
 from timegen.model_pipeline.core.core_extension import CustomNeuralForecast
-from timegen.metrics.evaluation_metrics import smape, mase, mae, rmse, rmsse
+from timegen.metrics.evaluation_metrics import mase, rmsse
 
 
 def evaluation_pipeline_timegen_forecast(
@@ -21,6 +22,7 @@ def evaluation_pipeline_timegen_forecast(
     dataset_source: str = None,
     dataset_group_source: str = None,
     mode: str = "in_domain",
+    plot: bool = True,
 ) -> None:
     """
     Evaluate forecast for different modes: basic forecasting and transfer learning
@@ -75,6 +77,7 @@ def evaluation_pipeline_timegen_forecast(
         dataset_group_source=dataset_group_source,
         freq=freq,
         h=horizon,
+        plot=plot,
     )
 
     metric_prefix = f"Forecast {{metric}} {{stat}} (last window) Per Series_{mode}"
@@ -83,74 +86,72 @@ def evaluation_pipeline_timegen_forecast(
         print(f"[Last Window ({mode})] No forecast results found.")
         row_forecast[f"Forecast SMAPE MEAN (last window) Per Series_{mode}"] = None
     else:
-        forecast_horizon = forecast_df_last_window_horizon.dropna(
-            subset=["y", "y_true"]
-        ).copy()
-        if forecast_horizon.empty:
+        valid = (
+            forecast_df_last_window_horizon[["y", "y_true"]]
+            .notna()
+            .all(axis=1)
+            .to_numpy()
+        )
+        if not valid.any():
             print(
                 f"[Last Window ({mode})] No valid y,y_true pairs. Can't compute sMAPE."
             )
             row_forecast[f"Forecast SMAPE (last window) Per Series_{mode}"] = None
         else:
-            smape_series = forecast_horizon.groupby("unique_id").apply(
-                lambda df: smape(df["y_true"], df["y"])
-            )
-
-            for stat_name, agg_func in {
-                "MEDIAN": np.nanmedian,
-                "MEAN": np.nanmean,
-            }.items():
-                value = float(round(agg_func(smape_series), 4))
-                key = metric_prefix.format(metric="SMAPE", stat=stat_name)
-                row_forecast[key] = value
-                print(f"[sMAPE/{stat_name} ({mode})] = {value:.4f}")
-
-            mase_series = forecast_df_last_window_horizon.groupby("unique_id").apply(
-                lambda df: mase(
-                    df["y_true"],
-                    df["y"],
-                    m=period,
-                    h=int(min(window_size, window_size_source)),
+            y_true = forecast_df_last_window_horizon["y_true"].to_numpy()
+            y_pred = forecast_df_last_window_horizon["y"].to_numpy()
+            h_eval = int(min(window_size, window_size_source))
+
+            # the scaled metrics need each full series, so they keep a pass
+            # over the series; the others are per-pair errors averaged by series
+            per_series = {"MASE": [], "RMSSE": []}
+            for idx in forecast_df_last_window_horizon.groupby(
+                "unique_id", sort=False
+            ).indices.values():
+                series_true, series_pred = y_true[idx], y_pred[idx]
+                per_series["MASE"].append(
+                    mase(series_true, series_pred, m=period, h=h_eval)
+                )
+                per_series["RMSSE"].append(
+                    rmsse(series_true, series_pred, h=h_eval, m=period)
                 )
-            )
-
-            for stat_name, agg_func in {
-                "MEDIAN": np.nanmedian,
-                "MEAN": np.nanmean,
-            }.items():
-                value = float(round(agg_func(mase_series), 4))
-                key = metric_prefix.format(metric="MASE", stat=stat_name)
-                row_forecast[key] = value
-                print(f"[MASE/{stat_name} ({mode})] = {value:.4f}")
-
-            mae_series = forecast_horizon.groupby("unique_id").apply(
-                lambda df: mae(df["y_true"], df["y"])
-            )
-            for stat, agg in {"MEDIAN": np.nanmedian, "MEAN": np.nanmean}.items():
-                val = float(round(agg(mae_series), 4))
-                row_forecast[metric_prefix.format(metric="MAE", stat=stat)] = val
-                print(f"[MAE/{stat} ({mode})]  = {val:.4f}")
 
-            rmse_series = forecast_horizon.groupby("unique_id").apply(
-                lambda df: rmse(df["y_true"], df["y"])
+            codes, uniques = pd.factorize(
+                forecast_df_last_window_horizon["unique_id"]
             )
-            for stat, agg in {"MEDIAN": np.nanmedian, "MEAN": np.nanmean}.items():
-                val = float(round(agg(rmse_series), 4))
-                row_forecast[metric_prefix.format(metric="RMSE", stat=stat)] = val
-                print(f"[RMSE/{stat} ({mode})] = {val:.4f}")
-
-            rmsse_series = forecast_df_last_window_horizon.groupby("unique_id").apply(
-                lambda d: rmsse(
-                    d["y_true"],
-                    d["y"],
-                    h=int(min(window_size, window_size_source)),
-                    m=period,
-                )
+            codes = codes[valid]
+            y_true_v = y_true[valid].astype(float)
+            y_pred_v = y_pred[valid].astype(float)
+            abs_err = np.abs(y_true_v - y_pred_v)
+            denominator = np.abs(y_true_v) + np.abs(y_pred_v)
+            # same terms as smape(), zero where both values are ~0
+            smape_terms = np.where(
+                denominator < 1e-3,
+                0.0,
+                2 * abs_err / np.where(denominator < 1e-3, 1.0, denominator),
             )
-            for stat, agg in {"MEDIAN": np.nanmedian, "MEAN": np.nanmean}.items():
-                val = float(round(agg(rmsse_series), 4))
-                row_forecast[metric_prefix.format(metric="RMSSE", stat=stat)] = val
-                print(f"[RMSSE/{stat} ({mode})] = {val:.4f}")
+
+            counts = np.bincount(codes, minlength=len(uniques))
+            has_pairs = counts > 0
+            counts = counts[has_pairs]
+
+            def _series_mean(values):
+                sums = np.bincount(codes, weights=values, minlength=len(uniques))
+                return sums[has_pairs] / counts
+
+            per_series["SMAPE"] = 100 * _series_mean(smape_terms)
+            per_series["MAE"] = _series_mean(abs_err)
+            per_series["RMSE"] = np.sqrt(_series_mean(abs_err**2))
+
+            for metric in ("SMAPE", "MASE", "MAE", "RMSE", "RMSSE"):
+                for stat_name, agg_func in {
+                    "MEDIAN": np.nanmedian,
+                    "MEAN": np.nanmean,
+                }.items():
+                    value = float(round(agg_func(per_series[metric]), 4))
+                    key = metric_prefix.format(metric=metric, stat=stat_name)
+                    row_forecast[key] = value
+                    print(f"[{metric}/{stat_name} ({mode})] = {value:.4f}")
 
     with open(results_file, "w") as f:
         json.dump(row_forecast, f)
@@ -440,6 +440,7 @@ class TimeGEN(TimeGEN_S):
     def forward(
         self,
         windows_batch,
+        return_backcast: bool = True,
     ):
         insample_y = windows_batch["insample_y"]  # [B, L]
         insample_mask = windows_batch["insample_mask"]  # [B, L]
@@ -459,7 +460,9 @@ class TimeGEN(TimeGEN_S):
 
         initial_flip = insample_y_cond.flip(dims=(-1,))
 
-        residuals = insample_y_cond.flip(dims=(-1,))
+        # the residual updates below are out of place, so the chain can start
+        # from the flipped input itself instead of a second flipped copy
+        residuals = initial_flip
         insample_mask = insample_mask.flip(dims=(-1,))
 
         forecast = insample_y[:, -1:, None]  # shape [B, 1, 1]
@@ -482,10 +485,14 @@ class TimeGEN(TimeGEN_S):
             residuals = (residuals - backcast) * insample_mask
             forecast = forecast + block_forecast
 
-        sum_of_backcasts = initial_flip - residuals
-        backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+        # validation and prediction only use the forecast, so they can skip
+        # rebuilding the backcast (returned as None)
+        backcast_reconstruction = None
+        if return_backcast:
+            sum_of_backcasts = initial_flip - residuals
+            backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+            backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
 
-        backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
         forecast = self.loss.domain_map(forecast)
 
         return backcast_reconstruction, forecast, mu, logvar
@@ -497,6 +504,9 @@ class TimeGEN(TimeGEN_S):
         """
         windows = self._create_windows(batch, step="train")
         y_idx = batch["y_idx"]
+        # keep the targets on the original scale, normalization overwrites
+        # the windows in place
+        y_raw = windows["temporal"][:, :, y_idx].clone()
         windows = self._normalization(windows=windows, y_idx=y_idx)
 
         (
@@ -527,19 +537,13 @@ class TimeGEN(TimeGEN_S):
             y_hat=forecast, temporal_cols=batch["temporal_cols"], y_idx=y_idx
         )
 
-        # also put the targets back
-        insample_raw, _, _ = self._inv_normalization(
-            y_hat=insample_y, temporal_cols=batch["temporal_cols"], y_idx=y_idx
-        )
-        outsample_raw, _, _ = self._inv_normalization(
-            y_hat=outsample_y, temporal_cols=batch["temporal_cols"], y_idx=y_idx
-        )
+        # the targets on the original scale are the raw windows themselves,
+        # no need to invert their normalization
+        insample_raw = y_raw[:, : self.input_size]
+        outsample_raw = y_raw[:, self.input_size :]
 
-        recon_loss_fn = MAE(
-            horizon_weight=torch.ones(insample_raw.shape[-1], device=insample_y.device)
-        )
-        recon_loss = recon_loss_fn(
-            y_hat=backcast_raw, y=insample_raw, mask=insample_mask
+        recon_loss = self._masked_mae(
+            y=insample_raw, y_hat=backcast_raw, mask=insample_mask
         )
         forecast_loss = self.loss(
             y_hat=forecast_raw, y=outsample_raw, mask=outsample_mask
@@ -552,21 +556,20 @@ class TimeGEN(TimeGEN_S):
 
         kl = self.kl_divergence(mu, logvar)
 
-        recon_weight = 1
-        pred_weight = 1
+        # kl_w is a plain float folded into a single fused add, and the
+        # reconstruction and forecast terms are weighted equally
+        total_loss = torch.add(recon_loss + forecast_loss, kl, alpha=kl_w)
 
-        total_loss = recon_weight * recon_loss + pred_weight * forecast_loss + kl_w * kl
+        # log detached tensors: Lightning only moves them to the host when it
+        # actually writes the logs, instead of a device sync per metric per step
+        self.log("train_recon_loss", recon_loss.detach())
+        self.log("train_forecast_loss", forecast_loss.detach())
+        self.log("train_kl", kl.detach())
+        self.log("train_total_loss", total_loss.detach())
+        self.log("train_loss", total_loss.detach(), prog_bar=True)
 
-        self.log("train_recon_loss", recon_loss.detach().cpu().item())
-        self.log("train_forecast_loss", forecast_loss.detach().cpu().item())
-        self.log("train_kl", kl.detach().cpu().item())
-        self.log("train_total_loss", total_loss.detach().cpu().item())
-        self.log("train_loss", total_loss.detach().cpu().item(), prog_bar=True)
-
-        self.log("latent/mu_mean", mu.mean().detach().cpu().item(), on_step=True)
-        self.log(
-            "latent/logvar_mean", logvar.mean().detach().cpu().item(), on_step=True
-        )
+        self.log("latent/mu_mean", mu.detach().mean(), on_step=True)
+        self.log("latent/logvar_mean", logvar.detach().mean(), on_step=True)
 
         if self.global_step % 200 == 0:
             print(
@@ -575,5 +578,6 @@ class TimeGEN(TimeGEN_S):
                 f"total: {total_loss.item():.4f}"
             )
 
-        self.train_trajectories.append((self.global_step, total_loss.detach().item()))
+        # keep the detached tensor, on_train_end turns them into floats at once
+        self.train_trajectories.append((self.global_step, total_loss.detach()))
         return total_loss
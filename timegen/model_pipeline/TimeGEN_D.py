@@ -437,6 +437,7 @@ class TimeGEN_D(TimeGEN_S):
     def forward(
         self,
         windows_batch,
+        return_backcast: bool = True,
     ):
         insample_y = windows_batch["insample_y"]  # [B, L]
         insample_mask = windows_batch["insample_mask"]  # [B, L]
@@ -456,7 +457,9 @@ class TimeGEN_D(TimeGEN_S):
 
         initial_flip = insample_y_cond.flip(dims=(-1,))
 
-        residuals = insample_y_cond.flip(dims=(-1,))
+        # the residual updates below are out of place, so the chain can start
+        # from the flipped input itself instead of a second flipped copy
+        residuals = initial_flip
         insample_mask = insample_mask.flip(dims=(-1,))
 
         forecast = insample_y[:, -1:, None]  # shape [B, 1, 1]
@@ -479,10 +482,14 @@ class TimeGEN_D(TimeGEN_S):
             residuals = (residuals - backcast) * insample_mask
             forecast = forecast + block_forecast
 
-        sum_of_backcasts = initial_flip - residuals
-        backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+        # validation and prediction only use the forecast, so they can skip
+        # rebuilding the backcast (returned as None)
+        backcast_reconstruction = None
+        if return_backcast:
+            sum_of_backcasts = initial_flip - residuals
+            backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+            backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
 
-        backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
         forecast = self.loss.domain_map(forecast)
 
         return backcast_reconstruction, forecast, mu, logvar
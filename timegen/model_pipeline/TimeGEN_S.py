@@ -69,24 +69,17 @@ class TimeGENEncoder(nn.Module):
     ):
         batch_size = insample_y.size(0)
 
-        insample_y = insample_y.reshape(batch_size, -1)
-
+        # only concatenate the inputs that exist, so no empty placeholder
+        # tensors are allocated on the device at every forward
+        inputs = [insample_y.reshape(batch_size, -1)]
         if self.futr_input_size > 0:
-            futr_exog = futr_exog.reshape(batch_size, -1)
-        else:
-            futr_exog = torch.zeros(batch_size, 0, device=insample_y.device)
-
+            inputs.append(futr_exog.reshape(batch_size, -1))
         if self.hist_input_size > 0:
-            hist_exog = hist_exog.reshape(batch_size, -1)
-        else:
-            hist_exog = torch.zeros(batch_size, 0, device=insample_y.device)
-
+            inputs.append(hist_exog.reshape(batch_size, -1))
         if self.stat_input_size > 0:
-            stat_exog = stat_exog.reshape(batch_size, -1)
-        else:
-            stat_exog = torch.zeros(batch_size, 0, device=insample_y.device)
+            inputs.append(stat_exog.reshape(batch_size, -1))
 
-        x = torch.cat([insample_y, futr_exog, hist_exog, stat_exog], dim=1)
+        x = torch.cat(inputs, dim=1) if len(inputs) > 1 else inputs[0]
 
         hidden = self.net(x)
         mu = self.fc_mu(hidden)
@@ -94,6 +87,15 @@ class TimeGENEncoder(nn.Module):
         return mu, logvar
 
 
+@torch.jit.script
+def _kl_divergence(mu: torch.Tensor, logvar: torch.Tensor) -> torch.Tensor:
+    # scripted so the clamp/exp/square terms fuse into a single kernel on GPU;
+    # mean over the batch of the per-sample sums is one sum divided by B
+    logvar_clamped = torch.clamp(logvar, min=-10.0, max=10.0)
+    kl_terms = 1 + logvar_clamped - mu * mu - logvar_clamped.exp()
+    return -0.5 * kl_terms.sum() / mu.shape[0]
+
+
 class TimeGEN_S(NHITS):
     """
     A VAE-like data_pipeline that encodes the time-series input into a latent space,
@@ -229,10 +231,14 @@ class TimeGEN_S(NHITS):
             z = mu + sigma * eps
         where eps ~ N(0, I).
         """
-        logvar = torch.clamp(logvar, min=-10.0, max=10.0)
-        std = torch.exp(0.5 * logvar)
-        eps = torch.randn_like(std)
-        return mu + eps * std
+        # sample in fp32 even under mixed precision, the exp of a half
+        # precision log-variance loses most of its range
+        with torch.autocast(device_type=mu.device.type, enabled=False):
+            logvar = torch.clamp(logvar.float(), min=-10.0, max=10.0)
+            std = torch.exp(0.5 * logvar)
+            eps = torch.randn_like(std)
+            # fused multiply-add, no intermediate eps * std tensor
+            return torch.addcmul(mu.float(), eps, std)
 
     @staticmethod
     def kl_divergence(mu, logvar):
@@ -241,12 +247,29 @@ class TimeGEN_S(NHITS):
         D_KL(q(z|x) || p(z)) = -0.5 * sum(1 + logvar - mu^2 - exp(logvar))
         """
         # We can clamp here too (double safety).
-        logvar_clamped = torch.clamp(logvar, min=-10.0, max=10.0)
-        return -0.5 * torch.mean(
-            torch.sum(1 + logvar_clamped - mu**2 - logvar_clamped.exp(), dim=1)
-        )
+        # Always computed in fp32, so it stays accurate under mixed precision.
+        return _kl_divergence(mu.float(), logvar.float())
+
+    @staticmethod
+    def _masked_mae(y, y_hat, mask):
+        """
+        Masked MAE over every window and step, the same value as an unweighted
+        MAE loss but in one pass without building a horizon weight tensor.
+        """
+        return (torch.abs(y - y_hat) * mask).sum() / mask.sum().clamp_min(1)
+
+    @staticmethod
+    def _slice_windows(windows, start, end):
+        """
+        Take the windows [start, end) out of a window set that was built once,
+        instead of re-running _create_windows for every inference batch.
+        """
+        static = windows.get("static")
+        if static is not None:
+            static = static.reshape(-1, static.shape[-1])[start:end]
+        return dict(windows, temporal=windows["temporal"][start:end], static=static)
 
-    def forward(self, windows_batch):
+    def forward(self, windows_batch, return_backcast: bool = True):
         insample_y = windows_batch["insample_y"]  # [B, L]
         insample_mask = windows_batch["insample_mask"]  # [B, L]
         futr_exog = windows_batch["futr_exog"]  # [B, L+h, F] or [B, L+H, F]
@@ -263,7 +286,9 @@ class TimeGEN_S(NHITS):
         insample_y_cond = insample_y + z_insample  # shape [B, L]
         initial_flip = insample_y_cond.flip(dims=(-1,))
 
-        residuals = insample_y_cond.flip(dims=(-1,))
+        # the residual updates below are out of place, so the chain can start
+        # from the flipped input itself instead of a second flipped copy
+        residuals = initial_flip
         insample_mask = insample_mask.flip(dims=(-1,))
 
         forecast = insample_y[:, -1:, None]  # shape [B, 1, 1]
@@ -278,14 +303,49 @@ class TimeGEN_S(NHITS):
             residuals = (residuals - backcast) * insample_mask
             forecast = forecast + block_forecast
 
-        sum_of_backcasts = initial_flip - residuals
-        backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+        # validation and prediction only use the forecast, so they can skip
+        # rebuilding the backcast (returned as None)
+        backcast_reconstruction = None
+        if return_backcast:
+            sum_of_backcasts = initial_flip - residuals
+            backcast_reconstruction = sum_of_backcasts.flip(dims=(-1,))
+            backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
 
-        backcast_reconstruction = self.loss.domain_map(backcast_reconstruction)
         forecast = self.loss.domain_map(forecast)
 
         return backcast_reconstruction, forecast, mu, logvar
 
+    def configure_optimizers(self):
+        """
+        Use the fused CUDA Adam kernel (one launch for all parameters)
+        when training on GPU with the default optimizer and scheduler.
+        The optimizer is built here only, self.optimizer/optimizer_kwargs are
+        left alone so a later fit or load on CPU gets the plain Adam.
+        """
+        if (
+            self.optimizer is None
+            and not self.optimizer_kwargs
+            and self.lr_scheduler is None
+            and not self.lr_scheduler_kwargs
+            and self.device.type == "cuda"
+        ):
+            optimizer = torch.optim.Adam(
+                self.parameters(), lr=self.learning_rate, fused=True
+            )
+            # same default schedule as BaseModel.configure_optimizers
+            scheduler = torch.optim.lr_scheduler.StepLR(
+                optimizer=optimizer, step_size=self.lr_decay_steps, gamma=0.5
+            )
+            return {
+                "optimizer": optimizer,
+                "lr_scheduler": {
+                    "frequency": 1,
+                    "interval": "step",
+                    "scheduler": scheduler,
+                },
+            }
+        return super().configure_optimizers()
+
     def training_step(self, batch, batch_idx):
         """
         Custom training step overriding the parent.
@@ -322,10 +382,7 @@ class TimeGEN_S(NHITS):
         # print(f"[DEBUG] outsample_y: {outsample_y.shape}", flush=True)
         # print(f"[DEBUG] outsample_mask: {outsample_mask.shape}", flush=True)
 
-        recon_loss_fn = MAE(
-            horizon_weight=torch.ones(insample_y.shape[-1], device=insample_y.device)
-        )
-        recon_loss = recon_loss_fn(y_hat=backcast, y=insample_y, mask=insample_mask)
+        recon_loss = self._masked_mae(y=insample_y, y_hat=backcast, mask=insample_mask)
         forecast_loss = self.loss(y_hat=forecast, y=outsample_y, mask=outsample_mask)
 
         # KL warmup
@@ -335,21 +392,20 @@ class TimeGEN_S(NHITS):
 
         kl = self.kl_divergence(mu, logvar)
 
-        recon_weight = 1
-        pred_weight = 1
+        # kl_w is a plain float folded into a single fused add, and the
+        # reconstruction and forecast terms are weighted equally
+        total_loss = torch.add(recon_loss + forecast_loss, kl, alpha=kl_w)
 
-        total_loss = recon_weight * recon_loss + pred_weight * forecast_loss + kl_w * kl
+        # log detached tensors: Lightning only moves them to the host when it
+        # actually writes the logs, instead of a device sync per metric per step
+        self.log("train_recon_loss", recon_loss.detach())
+        self.log("train_forecast_loss", forecast_loss.detach())
+        self.log("train_kl", kl.detach())
+        self.log("train_total_loss", total_loss.detach())
+        self.log("train_loss", total_loss.detach(), prog_bar=True)
 
-        self.log("train_recon_loss", recon_loss.detach().cpu().item())
-        self.log("train_forecast_loss", forecast_loss.detach().cpu().item())
-        self.log("train_kl", kl.detach().cpu().item())
-        self.log("train_total_loss", total_loss.detach().cpu().item())
-        self.log("train_loss", total_loss.detach().cpu().item(), prog_bar=True)
-
-        self.log("latent/mu_mean", mu.mean().detach().cpu().item(), on_step=True)
-        self.log(
-            "latent/logvar_mean", logvar.mean().detach().cpu().item(), on_step=True
-        )
+        self.log("latent/mu_mean", mu.detach().mean(), on_step=True)
+        self.log("latent/logvar_mean", logvar.detach().mean(), on_step=True)
 
         if self.global_step % 200 == 0:
             print(
@@ -358,16 +414,32 @@ class TimeGEN_S(NHITS):
                 f"total: {total_loss.item():.4f}"
             )
 
-        self.train_trajectories.append((self.global_step, total_loss.detach().item()))
+        # keep the detached tensor, on_train_end turns them into floats at once
+        self.train_trajectories.append((self.global_step, total_loss.detach()))
         return total_loss
 
+    def on_train_end(self):
+        """
+        Convert the per-step losses in train_trajectories to floats with a
+        single device sync, instead of one .item() per training step.
+        """
+        trajectories = self.train_trajectories
+        pending = [
+            i for i, (_, loss) in enumerate(trajectories) if torch.is_tensor(loss)
+        ]
+        if pending:
+            values = torch.stack([trajectories[i][1].float() for i in pending])
+            for i, value in zip(pending, values.tolist()):
+                trajectories[i] = (trajectories[i][0], value)
+        super().on_train_end()
+
     def validation_step(self, batch, batch_idx):
         if self.val_size == 0:
             return np.nan
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="val")
-        n_windows = len(windows["temporal"])
+        # build all windows once and slice them per batch
+        all_windows = self._create_windows(batch, step="val")
+        n_windows = len(all_windows["temporal"])
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -376,14 +448,14 @@ class TimeGEN_S(NHITS):
             windows_batch_size = n_windows
         n_batches = int(np.ceil(n_windows / windows_batch_size))
 
-        valid_losses = []
-        batch_sizes = []
+        weighted_losses = []
         for i in range(n_batches):
-            # Create and normalize windows [Ws, L+H, C]
-            w_idxs = np.arange(
-                i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
+            # Slice and normalize windows [Ws, L+H, C]
+            windows = self._slice_windows(
+                all_windows,
+                start=i * windows_batch_size,
+                end=min((i + 1) * windows_batch_size, n_windows),
             )
-            windows = self._create_windows(batch, step="val", w_idxs=w_idxs)
             original_outsample_y = torch.clone(windows["temporal"][:, -self.h :, y_idx])
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
@@ -407,7 +479,7 @@ class TimeGEN_S(NHITS):
             )  # [Ws, S]
 
             # Model Predictions
-            backcast, forecast, mu, logvar = self(windows_batch)
+            _, forecast, _, _ = self(windows_batch, return_backcast=False)
             valid_loss_batch = self._compute_valid_loss(
                 outsample_y=original_outsample_y,
                 output=forecast,
@@ -415,13 +487,11 @@ class TimeGEN_S(NHITS):
                 temporal_cols=batch["temporal_cols"],
                 y_idx=batch["y_idx"],
             )
-            valid_losses.append(valid_loss_batch)
-            batch_sizes.append(len(forecast))
+            weighted_losses.append(valid_loss_batch * len(forecast))
 
-        valid_loss = torch.stack(valid_losses)
-        batch_sizes = torch.tensor(batch_sizes, device=valid_loss.device)
-        batch_size = torch.sum(batch_sizes)
-        valid_loss = torch.sum(valid_loss * batch_sizes) / batch_size
+        # window-weighted mean, reduced on device in a single pass
+        batch_size = n_windows
+        valid_loss = torch.stack(weighted_losses).sum() / batch_size
 
         if torch.isnan(valid_loss):
             raise Exception("Loss is NaN, training stopped.")
@@ -438,9 +508,9 @@ class TimeGEN_S(NHITS):
 
     def predict_step(self, batch, batch_idx):
 
-        # TODO: Hack to compute number of windows
-        windows = self._create_windows(batch, step="predict")
-        n_windows = len(windows["temporal"])
+        # build all windows once and slice them per batch
+        all_windows = self._create_windows(batch, step="predict")
+        n_windows = len(all_windows["temporal"])
         y_idx = batch["y_idx"]
 
         # Number of windows in batch
@@ -451,11 +521,12 @@ class TimeGEN_S(NHITS):
 
         y_hats = []
         for i in range(n_batches):
-            # Create and normalize windows [Ws, L+H, C]
-            w_idxs = np.arange(
-                i * windows_batch_size, min((i + 1) * windows_batch_size, n_windows)
+            # Slice and normalize windows [Ws, L+H, C]
+            windows = self._slice_windows(
+                all_windows,
+                start=i * windows_batch_size,
+                end=min((i + 1) * windows_batch_size, n_windows),
             )
-            windows = self._create_windows(batch, step="predict", w_idxs=w_idxs)
             windows = self._normalization(windows=windows, y_idx=y_idx)
 
             # Parse windows
@@ -472,7 +543,7 @@ class TimeGEN_S(NHITS):
             )  # [Ws, S]
 
             # Model Predictions
-            backcast, forecast, mu, logvar = self(windows_batch)
+            _, forecast, _, _ = self(windows_batch, return_backcast=False)
             # Inverse normalization and sampling
             if self.loss.is_distribution_output:
                 _, y_loc, y_scale = self._inv_normalization(
@@ -1,49 +1,86 @@
+from copy import deepcopy
+import functools
 from os import cpu_count
+import platform
 import torch
 
-from ray import tune
+from ray import air, tune
+from ray.tune.schedulers import ASHAScheduler
 
 from timegen.model_pipeline.TimeGEN_S import TimeGEN_S
 from timegen.model_pipeline.TimeGEN_M import TimeGEN_M
 from timegen.model_pipeline.TimeGEN_D import TimeGEN_D
 from timegen.model_pipeline.TimeGEN import TimeGEN
 
-from ray.tune.search.basic_variant import BasicVariantGenerator
 from neuralforecast.losses.pytorch import MAE, MSE
 from neuralforecast.auto import BaseAuto
 
 
-class AutoTimeGEN_S(BaseAuto):
-
-    default_config = {
-        "latent_dim": tune.choice([16, 32, 64, 128, 256]),
-        "encoder_hidden_dims": tune.choice(
-            [[64, 32], [256, 128], [512, 256], [512, 256, 128]]
-        ),
-        # NHITS-like parameters
-        "input_size_multiplier": [1, 2, 3, 4, 5],
-        "h": None,
-        "n_pool_kernel_size": tune.choice(
-            [[2, 2, 1], 3 * [1], 3 * [2], 3 * [4], [8, 4, 1], [16, 8, 1]]
-        ),
-        "n_freq_downsample": tune.choice(
-            [
-                [168, 24, 1],
-                [24, 12, 1],
-                [180, 60, 1],
-                [60, 8, 1],
-                [40, 20, 1],
-                [1, 1, 1],
-            ]
-        ),
-        "learning_rate": tune.loguniform(1e-5, 1e-2),
-        "scaler_type": tune.choice([None, "robust", "standard"]),
-        "max_steps": tune.quniform(lower=500, upper=1500, q=100),
-        "batch_size": tune.choice([32, 64, 128, 256]),
-        "windows_batch_size": tune.choice([128, 256, 512, 1024]),
-        "loss": None,
-        "random_seed": tune.randint(lower=1, upper=20),
-    }
+# search space shared by the TimeGEN variants, built once at import and
+# extended by each class with its own keys (key order is kept as before,
+# so the seeded searches draw the same configurations)
+_MIXTURE_DEFAULT_CONFIG = {
+    "n_beats_nblocks_stack_1": tune.choice([0, 1]),
+    "n_beats_nblocks_stack_2": tune.choice([0, 1]),
+    "n_beats_nblocks_stack_3": tune.choice([0, 1]),
+}
+
+_VAE_DEFAULT_CONFIG = {
+    "latent_dim": tune.choice([16, 32, 64, 128, 256]),
+    "encoder_hidden_dims": tune.choice(
+        [[64, 32], [256, 128], [512, 256], [512, 256, 128]]
+    ),
+}
+
+_BASE_DEFAULT_CONFIG = {
+    # NHITS params
+    "input_size_multiplier": [1, 2, 3, 4, 5],
+    "h": None,
+    "n_pool_kernel_size": tune.choice(
+        [[2, 2, 1], 3 * [1], 3 * [2], 3 * [4], [8, 4, 1], [16, 8, 1]]
+    ),
+    "n_freq_downsample": tune.choice(
+        [
+            [168, 24, 1],
+            [24, 12, 1],
+            [180, 60, 1],
+            [60, 8, 1],
+            [40, 20, 1],
+            [1, 1, 1],
+        ]
+    ),
+    # model params
+    "learning_rate": tune.loguniform(1e-5, 1e-2),
+    "scaler_type": tune.choice([None, "robust", "standard"]),
+    "max_steps": tune.quniform(lower=500, upper=1500, q=100),
+    "batch_size": tune.choice([32, 64, 128, 256]),
+    "windows_batch_size": tune.choice([128, 256, 512, 1024]),
+    "loss": None,
+    "random_seed": tune.randint(lower=1, upper=20),
+}
+
+
+class _AutoTimeGENBase(BaseAuto):
+    """
+    BaseAuto that also hands a trial scheduler to Ray Tune. By default
+    an ASHAScheduler stops the worst trials at every rung of validation
+    checks, freeing their resources for the promising ones.
+    With the ray backend the default search algorithm (search_alg=None or
+    "optuna") is Optuna's TPE through Ray Tune, limited to the trials that
+    can run at once and suggested in batches; pass a BasicVariantGenerator
+    for plain random search.
+    Known good configurations can be given in points_to_evaluate, they
+    are tried first so the search starts from them instead of from scratch
+    (with a custom search_alg, give them to that searcher instead).
+    time_budget_s bounds the wall time of the whole search, trials still
+    running when it expires are stopped.
+    The variants only differ in the wrapped model and default_config, they
+    are built by _make_auto_timegen.
+    """
+
+    # set on every variant by _make_auto_timegen
+    _model_cls = None
+    default_config = None
 
     def __init__(
         self,
@@ -51,22 +88,33 @@ class AutoTimeGEN_S(BaseAuto):
         loss=MAE(),
         valid_loss=None,
         config=None,
-        search_alg=BasicVariantGenerator(random_state=1),
+        search_alg=None,
         num_samples=10,
         refit_with_val=False,
-        cpus=cpu_count(),
-        gpus=torch.cuda.device_count(),
+        cpus=None,
+        gpus=None,
         verbose=False,
         alias=None,
         backend="ray",
         callbacks=None,
+        scheduler=None,
+        points_to_evaluate=None,
+        time_budget_s=None,
     ):
-
         if config is None:
             config = self.get_default_config(h=h, backend=backend)
 
-        super(AutoTimeGEN_S, self).__init__(
-            cls_model=TimeGEN_S,
+        # resolve the default resources when a wrapper is built rather than
+        # in the signature, so they reflect the devices visible at that point
+        # (importing neuralforecast.auto still queries CUDA for BaseAuto's own
+        # defaults)
+        if cpus is None:
+            cpus = cpu_count()
+        if gpus is None:
+            gpus = torch.cuda.device_count()
+
+        super().__init__(
+            cls_model=self._model_cls,
             h=h,
             loss=loss,
             valid_loss=valid_loss,
@@ -81,284 +129,186 @@ class AutoTimeGEN_S(BaseAuto):
             backend=backend,
             callbacks=callbacks,
         )
-
-    @classmethod
-    def get_default_config(cls, h, backend, n_series=None):
-        config = cls.default_config.copy()
-        config["input_size"] = tune.choice(
-            [h * x for x in config["input_size_multiplier"]]
+        if self.search_alg == "optuna" and self.backend != "ray":
+            raise ValueError(
+                'search_alg="optuna" is only supported with the ray backend, '
+                "use an optuna sampler with backend='optuna' instead."
+            )
+        if self.backend == "ray" and self.search_alg in (None, "optuna"):
+            self.search_alg = self._optuna_search_alg(points_to_evaluate)
+        elif points_to_evaluate:
+            raise ValueError(
+                "points_to_evaluate is only used by the default Optuna search "
+                "algorithm, pass it to your search algorithm instead."
+            )
+        if scheduler is None:
+            scheduler = ASHAScheduler(
+                time_attr="training_iteration",
+                grace_period=3,
+                reduction_factor=3,
+            )
+        self.scheduler = scheduler
+        self.time_budget_s = time_budget_s
+
+    def _optuna_search_alg(self, points_to_evaluate=None):
+        # imported here, only the ray backend builds its own searcher
+        import optuna
+        from ray.tune.search import ConcurrencyLimiter
+        from ray.tune.search.optuna import OptunaSearch
+
+        # TPE learns from finished trials, so suggest no more trials than
+        # the reserved resources can run at the same time
+        if self.gpus > 0:
+            max_concurrent = int(torch.cuda.device_count() // self.gpus)
+        else:
+            max_concurrent = int(cpu_count() // self.cpus)
+
+        return ConcurrencyLimiter(
+            OptunaSearch(
+                sampler=optuna.samplers.TPESampler(seed=1),
+                points_to_evaluate=(
+                    list(points_to_evaluate) if points_to_evaluate else None
+                ),
+            ),
+            max_concurrent=max(1, max_concurrent),
+            # hand out a whole round of suggestions at once, and only ask
+            # for the next round when all of it has been reported
+            batch=True,
         )
-        config["step_size"] = tune.choice([1, h])
-        del config["input_size_multiplier"]
-        if backend == "optuna":
-            config = cls._ray_config_to_optuna(config)
-
-        return config
-
-
-class AutoTimeGEN_M(BaseAuto):
 
-    default_config = {
-        # mixture params
-        "n_beats_nblocks_stack_1": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_2": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_3": tune.choice([0, 1]),
-        # VAE params
-        "latent_dim": tune.choice([16, 32, 64, 128, 256]),
-        "encoder_hidden_dims": tune.choice(
-            [[64, 32], [256, 128], [512, 256], [512, 256, 128]]
-        ),
-        # NHITS params
-        "input_size_multiplier": [1, 2, 3, 4, 5],
-        "h": None,
-        "n_pool_kernel_size": tune.choice(
-            [[2, 2, 1], 3 * [1], 3 * [2], 3 * [4], [8, 4, 1], [16, 8, 1]]
-        ),
-        "n_freq_downsample": tune.choice(
-            [
-                [168, 24, 1],
-                [24, 12, 1],
-                [180, 60, 1],
-                [60, 8, 1],
-                [40, 20, 1],
-                [1, 1, 1],
-            ]
-        ),
-        # model params
-        "learning_rate": tune.loguniform(1e-5, 1e-2),
-        "scaler_type": tune.choice([None, "robust", "standard"]),
-        "max_steps": tune.quniform(lower=500, upper=1500, q=100),
-        "batch_size": tune.choice([32, 64, 128, 256]),
-        "windows_batch_size": tune.choice([128, 256, 512, 1024]),
-        "loss": None,
-        "random_seed": tune.randint(lower=1, upper=20),
-    }
-
-    def __init__(
+    def _tune_model(
         self,
-        h,
-        loss=MAE(),
-        valid_loss=None,
-        config=None,
-        search_alg=BasicVariantGenerator(random_state=1),
-        num_samples=10,
-        refit_with_val=False,
-        cpus=cpu_count(),
-        gpus=torch.cuda.device_count(),
-        verbose=False,
-        alias=None,
-        backend="ray",
-        callbacks=None,
+        cls_model,
+        dataset,
+        val_size,
+        test_size,
+        cpus,
+        gpus,
+        verbose,
+        num_samples,
+        search_alg,
+        config,
     ):
-
-        if config is None:
-            config = self.get_default_config(h=h, backend=backend)
-
-        super(AutoTimeGEN_M, self).__init__(
-            cls_model=TimeGEN_M,
-            h=h,
-            loss=loss,
-            valid_loss=valid_loss,
-            config=config,
-            search_alg=search_alg,
-            num_samples=num_samples,
-            refit_with_val=refit_with_val,
-            cpus=cpus,
-            gpus=gpus,
-            verbose=verbose,
-            alias=alias,
-            backend=backend,
-            callbacks=callbacks,
+        train_fn_with_parameters = tune.with_parameters(
+            self._train_tune,
+            cls_model=cls_model,
+            dataset=dataset,
+            val_size=val_size,
+            test_size=test_size,
         )
 
-    @classmethod
-    def get_default_config(cls, h, backend, n_series=None):
-        config = cls.default_config.copy()
-        config["input_size"] = tune.choice(
-            [h * x for x in config["input_size_multiplier"]]
+        # Device
+        if gpus > 0:
+            device_dict = {"gpu": gpus}
+        else:
+            device_dict = {"cpu": cpus}
+
+        # on Windows, prevent long trial directory names
+        trial_dirname_creator = (
+            (lambda trial: f"{trial.trainable_name}_{trial.trial_id}")
+            if platform.system() == "Windows"
+            else None
         )
-        config["step_size"] = tune.choice([1, h])
-        del config["input_size_multiplier"]
-        if backend == "optuna":
-            config = cls._ray_config_to_optuna(config)
-
-        return config
-
-
-class AutoTimeGEN(BaseAuto):
 
-    default_config = {
-        # mixture params
-        "n_beats_nblocks_stack_1": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_2": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_3": tune.choice([0, 1]),
-        # VAE params
-        "latent_dim": tune.choice([16, 32, 64, 128, 256, 512]),
-        "z_proj_out": tune.choice([16, 32, 64, 128, 256]),
-        "encoder_hidden_dims": tune.choice(
-            [[64, 32], [256, 128], [512, 256], [512, 256, 128]]
-        ),
-        # NHITS params
-        "input_size_multiplier": [1, 2, 3, 4, 5],
-        "h": None,
-        "n_pool_kernel_size": tune.choice(
-            [[2, 2, 1], 3 * [1], 3 * [2], 3 * [4], [8, 4, 1], [16, 8, 1]]
-        ),
-        "n_freq_downsample": tune.choice(
-            [
-                [168, 24, 1],
-                [24, 12, 1],
-                [180, 60, 1],
-                [60, 8, 1],
-                [40, 20, 1],
-                [1, 1, 1],
-            ]
-        ),
-        # model params
-        "learning_rate": tune.loguniform(1e-5, 1e-2),
-        "scaler_type": tune.choice([None, "robust", "standard"]),
-        "max_steps": tune.quniform(lower=500, upper=1500, q=100),
-        "batch_size": tune.choice([32, 64, 128, 256]),
-        "windows_batch_size": tune.choice([128, 256, 512, 1024]),
-        "loss": None,
-        "random_seed": tune.randint(lower=1, upper=20),
-    }
+        tuner = tune.Tuner(
+            tune.with_resources(train_fn_with_parameters, device_dict),
+            run_config=air.RunConfig(callbacks=self.callbacks, verbose=verbose),
+            tune_config=tune.TuneConfig(
+                metric="loss",
+                mode="min",
+                num_samples=num_samples,
+                search_alg=search_alg,
+                scheduler=deepcopy(self.scheduler),
+                time_budget_s=self.time_budget_s,
+                trial_dirname_creator=trial_dirname_creator,
+            ),
+            param_space=config,
+        )
+        return tuner.fit()
 
-    def __init__(
-        self,
-        h,
-        loss=MAE(),
-        valid_loss=None,
-        config=None,
-        search_alg=BasicVariantGenerator(random_state=1),
-        num_samples=10,
-        refit_with_val=False,
-        cpus=cpu_count(),
-        gpus=torch.cuda.device_count(),
-        verbose=False,
-        alias=None,
-        backend="ray",
-        callbacks=None,
+    @classmethod
+    def get_default_config(
+        cls, h, backend, n_series=None, grace_period=None, reduction_factor=None
     ):
+        """
+        Default search space for horizon h. Given grace_period and
+        reduction_factor, max_steps is searched over
+        grace_period * reduction_factor**k, k < 3.
+        These are optimizer steps, while the default ASHAScheduler counts
+        training_iteration, i.e. validation reports made every
+        val_check_steps steps. To end trials on the scheduler's rungs, pass
+        its grace_period multiplied by val_check_steps (e.g. 3 * 100 for the
+        default scheduler and val_check_steps=100).
+        """
+        if backend == "optuna":
+            # a config function, nothing for callers to edit, so share it
+            return cls._optuna_default_config(h, grace_period, reduction_factor)
 
-        if config is None:
-            config = self.get_default_config(h=h, backend=backend)
+        # the ray space is built once per class and arguments, callers get a
+        # copy they are free to edit
+        return dict(cls._ray_default_config(h, grace_period, reduction_factor))
 
-        super(AutoTimeGEN, self).__init__(
-            cls_model=TimeGEN,
-            h=h,
-            loss=loss,
-            valid_loss=valid_loss,
-            config=config,
-            search_alg=search_alg,
-            num_samples=num_samples,
-            refit_with_val=refit_with_val,
-            cpus=cpus,
-            gpus=gpus,
-            verbose=verbose,
-            alias=alias,
-            backend=backend,
-            callbacks=callbacks,
-        )
+    @classmethod
+    @functools.lru_cache(maxsize=8)
+    def _optuna_default_config(cls, h, grace_period, reduction_factor):
+        config = dict(cls._ray_default_config(h, grace_period, reduction_factor))
+        return cls._ray_config_to_optuna(config)
 
     @classmethod
-    def get_default_config(cls, h, backend, n_series=None):
+    @functools.lru_cache(maxsize=32)
+    def _ray_default_config(cls, h, grace_period, reduction_factor):
         config = cls.default_config.copy()
+        if grace_period is not None and reduction_factor is not None:
+            config["max_steps"] = tune.choice(
+                [grace_period * reduction_factor**k for k in range(3)]
+            )
         config["input_size"] = tune.choice(
             [h * x for x in config["input_size_multiplier"]]
         )
         config["step_size"] = tune.choice([1, h])
         del config["input_size_multiplier"]
-        if backend == "optuna":
-            config = cls._ray_config_to_optuna(config)
-
         return config
 
 
-class AutoTimeGEN_D(BaseAuto):
-
-    default_config = {
-        # mixture params
-        "n_beats_nblocks_stack_1": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_2": tune.choice([0, 1]),
-        "n_beats_nblocks_stack_3": tune.choice([0, 1]),
+def _make_auto_timegen(cls_model, default_config):
+    """
+    Auto wrapper for one TimeGEN variant, a _AutoTimeGENBase subclass named
+    Auto<variant> that lives in this module, so it prints and pickles like a
+    class defined here.
+    """
+    return type(
+        f"Auto{cls_model.__name__}",
+        (_AutoTimeGENBase,),
+        {
+            "__module__": __name__,
+            "_model_cls": cls_model,
+            "default_config": default_config,
+        },
+    )
+
+
+AutoTimeGEN_S = _make_auto_timegen(
+    TimeGEN_S, {**_VAE_DEFAULT_CONFIG, **_BASE_DEFAULT_CONFIG}
+)
+
+AutoTimeGEN_M = _make_auto_timegen(
+    TimeGEN_M,
+    {**_MIXTURE_DEFAULT_CONFIG, **_VAE_DEFAULT_CONFIG, **_BASE_DEFAULT_CONFIG},
+)
+
+AutoTimeGEN = _make_auto_timegen(
+    TimeGEN,
+    {
+        **_MIXTURE_DEFAULT_CONFIG,
         # VAE params
-        "latent_dim": tune.choice([16, 32, 64, 128, 256]),
-        "encoder_hidden_dims": tune.choice(
-            [[64, 32], [256, 128], [512, 256], [512, 256, 128]]
-        ),
-        # NHITS params
-        "input_size_multiplier": [1, 2, 3, 4, 5],
-        "h": None,
-        "n_pool_kernel_size": tune.choice(
-            [[2, 2, 1], 3 * [1], 3 * [2], 3 * [4], [8, 4, 1], [16, 8, 1]]
-        ),
-        "n_freq_downsample": tune.choice(
-            [
-                [168, 24, 1],
-                [24, 12, 1],
-                [180, 60, 1],
-                [60, 8, 1],
-                [40, 20, 1],
-                [1, 1, 1],
-            ]
-        ),
-        # model params
-        "learning_rate": tune.loguniform(1e-5, 1e-2),
-        "scaler_type": tune.choice([None, "robust", "standard"]),
-        "max_steps": tune.quniform(lower=500, upper=1500, q=100),
-        "batch_size": tune.choice([32, 64, 128, 256]),
-        "windows_batch_size": tune.choice([128, 256, 512, 1024]),
-        "loss": None,
-        "random_seed": tune.randint(lower=1, upper=20),
-    }
-
-    def __init__(
-        self,
-        h,
-        loss=MAE(),
-        valid_loss=None,
-        config=None,
-        search_alg=BasicVariantGenerator(random_state=1),
-        num_samples=10,
-        refit_with_val=False,
-        cpus=cpu_count(),
-        gpus=torch.cuda.device_count(),
-        verbose=False,
-        alias=None,
-        backend="ray",
-        callbacks=None,
-    ):
-
-        if config is None:
-            config = self.get_default_config(h=h, backend=backend)
-
-        super(AutoTimeGEN_D, self).__init__(
-            cls_model=TimeGEN_D,
-            h=h,
-            loss=loss,
-            valid_loss=valid_loss,
-            config=config,
-            search_alg=search_alg,
-            num_samples=num_samples,
-            refit_with_val=refit_with_val,
-            cpus=cpus,
-            gpus=gpus,
-            verbose=verbose,
-            alias=alias,
-            backend=backend,
-            callbacks=callbacks,
-        )
-
-    @classmethod
-    def get_default_config(cls, h, backend, n_series=None):
-        config = cls.default_config.copy()
-        config["input_size"] = tune.choice(
-            [h * x for x in config["input_size_multiplier"]]
-        )
-        config["step_size"] = tune.choice([1, h])
-        del config["input_size_multiplier"]
-        if backend == "optuna":
-            config = cls._ray_config_to_optuna(config)
-
-        return config
+        "latent_dim": tune.choice([16, 32, 64, 128, 256, 512]),
+        "z_proj_out": tune.choice([16, 32, 64, 128, 256]),
+        "encoder_hidden_dims": _VAE_DEFAULT_CONFIG["encoder_hidden_dims"],
+        **_BASE_DEFAULT_CONFIG,
+    },
+)
+
+AutoTimeGEN_D = _make_auto_timegen(
+    TimeGEN_D,
+    {**_MIXTURE_DEFAULT_CONFIG, **_VAE_DEFAULT_CONFIG, **_BASE_DEFAULT_CONFIG},
+)
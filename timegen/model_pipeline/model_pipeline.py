@@ -1,7 +1,9 @@
 import os
+import gc
 import numpy as np
 from typing import Tuple, Union
 import pandas as pd
+import torch
 from ray import tune
 from neuralforecast.auto import (
     AutoNHITS,
@@ -79,31 +81,30 @@ class ModelPipeline(_ModelListMixin):
         self.freq = self.hp.freq
         self.h = self.hp.h
 
+        # selecting the columns already returns a new frame and sort_values
+        # another one, so no extra .copy() is needed
+
         # TRAIN+VAL (transfer learning)
         self.trainval_long = (
             self.hp.original_trainval_long[["unique_id", "ds", "y"]]
-            .copy()
             .sort_values(["unique_id", "ds"])
         )
 
         # TRAIN+VAL (basic forecasting)
         self.trainval_long_basic_forecast = (
             self.hp.original_trainval_long_basic_forecast[["unique_id", "ds", "y"]]
-            .copy()
             .sort_values(["unique_id", "ds"])
         )
 
         # TEST data (transfer learning)
         self.test_long = (
             self.hp.original_test_long[["unique_id", "ds", "y"]]
-            .copy()
             .sort_values(["unique_id", "ds"])
         )
 
         # TEST (basic forecasting)
         self.test_long_basic_forecast = (
             self.hp.original_test_long_basic_forecast[["unique_id", "ds", "y"]]
-            .copy()
             .sort_values(["unique_id", "ds"])
         )
 
@@ -114,13 +115,36 @@ class ModelPipeline(_ModelListMixin):
         )
 
         self.models = {}
+        # where each model in self.models is saved, so it can be reloaded
+        self.model_paths = {}
+        self._context_cache = {}
 
     def hyper_tune_and_train(
-        self, dataset_source, dataset_group_source, max_evals=20, mode="in_domain"
+        self,
+        dataset_source,
+        dataset_group_source,
+        max_evals=20,
+        mode="in_domain",
+        precision=None,
+        cpus=None,
+        gpus=None,
+        dataloader_workers=None,
     ):
         """
         Trains and hyper-tunes all six models.
         Each data_pipeline does internal time-series cross-validation to select its best hyperparameters.
+
+        precision : str, optional
+            Lightning trainer precision used by every trial (e.g. "bf16-mixed"
+            or "16-mixed"). Defaults to full fp32 precision.
+        cpus, gpus : int, optional
+            Resources reserved by each Ray Tune trial. By default a trial takes
+            every CPU/GPU, so trials run one after the other; e.g. gpus=1 on a
+            four-GPU machine runs four trials concurrently.
+        dataloader_workers : int, optional
+            Number of DataLoader worker processes per trial, so batches are
+            prepared in the background. By default batches are built in the
+            training process.
         """
         original_mode = mode
         valid_modes = {
@@ -180,7 +204,26 @@ class ModelPipeline(_ModelListMixin):
             if original_mode == "out_domain":
                 base_config["input_size"] = self.h
 
+            if precision is not None:
+                base_config["precision"] = precision
+
+            dataloader_kwargs = {}
+            if torch.cuda.is_available():
+                # page-locked batches let Lightning copy them to the GPU asynchronously
+                dataloader_kwargs["pin_memory"] = True
+            if dataloader_workers:
+                # workers prepare the next batches while the current one trains,
+                # kept alive across epochs instead of re-spawned
+                dataloader_kwargs["num_workers"] = dataloader_workers
+                dataloader_kwargs["persistent_workers"] = True
+            if dataloader_kwargs:
+                base_config["dataloader_kwargs"] = dataloader_kwargs
+
             init_kwargs["config"] = base_config
+            if cpus is not None:
+                init_kwargs["cpus"] = cpus
+            if gpus is not None:
+                init_kwargs["gpus"] = gpus
 
             nf_save_path = os.path.join(
                 save_dir,
@@ -214,27 +257,14 @@ class ModelPipeline(_ModelListMixin):
                 print(f"Saved tuning results to {results_file}")
 
             self.models[name] = model
+            self.model_paths[name] = nf_save_path
 
-        print("\nAll Auto-models have been trained/tuned or loaded from disk.\n")
-
-    @staticmethod
-    def _mark_context_rows(
-        group: pd.DataFrame, window_size_source: int, horizon: int, mode: str
-    ) -> pd.DataFrame:
-        """
-        Given rows for a single unique_id (already sorted by ds),
-        slice off the last horizon points so we only keep the context portion.
-        Return an empty DataFrame if not enough data.
-        """
-        n = len(group)
-        if n < window_size_source + horizon:
-            return pd.DataFrame(columns=group.columns)
-
-        if mode == "out_domain":
-            horizon = min(window_size_source, horizon)
+            # release what the finished tuning run left behind before the next model
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
 
-        last_window_end = n - horizon
-        return group.iloc[:last_window_end].copy()
+        print("\nAll Auto-models have been trained/tuned or loaded from disk.\n")
 
     def _preprocess_context(
         self, window_size: int,
@@ -242,33 +272,44 @@ class ModelPipeline(_ModelListMixin):
             window_size_source: int = None,
             mode: str = None
     ) -> pd.DataFrame:
+        """
+        For each unique_id (sorted by ds), slice off the last horizon points
+        so we only keep the context portion. Series without enough data for
+        window_size_source + window_size points are dropped.
+        The result is cached, as every model is evaluated on the same context;
+        it is shared between callers, so treat it as read-only (the callers
+        only pass it to model.predict).
+        """
         if not window_size_source:
             window_size_source = window_size
 
-        df_test = test_set.sort_values(["unique_id", "ds"]).copy()
+        cache_key = (id(test_set), window_size, window_size_source, mode)
+        cached = self._context_cache.get(cache_key)
+        if cached is not None and cached[0] is test_set:
+            return cached[1]
 
-        df_context = df_test.groupby(
-            "unique_id", group_keys=True, as_index=False
-        ).apply(
-            lambda g: self._mark_context_rows(
-                group=g,
-                window_size_source=window_size_source,
-                horizon=window_size,
-                mode=mode
-            )
-        )
-        df_context = df_context.reset_index(drop=True)
+        horizon = window_size
+        if mode == "out_domain":
+            horizon = min(window_size_source, horizon)
 
-        if "y_true" in df_context.columns:
-            df_context = df_context.rename(columns={"y_true": "y"})
+        df_test = test_set.sort_values(["unique_id", "ds"])
+
+        # position and length of every row's series in a single vectorized pass
+        grouped = df_test.groupby("unique_id", observed=True, sort=False)
+        position = grouped.cumcount()
+        n = grouped["ds"].transform("size")
 
-        return df_context[["unique_id", "ds", "y"]].sort_values(["unique_id", "ds"])
+        keep = (n >= window_size_source + window_size) & (position < n - horizon)
+        df_context = df_test[keep].reset_index(drop=True)
 
-    @staticmethod
-    def _mark_prediction_rows(group: pd.DataFrame, horizon: int) -> pd.DataFrame:
+        if "y_true" in df_context.columns:
+            df_context = df_context.rename(columns={"y_true": "y"})
 
-        last_window_end = horizon
-        return group.iloc[:last_window_end].copy()
+        df_context = df_context[["unique_id", "ds", "y"]]
+        # keeping test_set alive with the result means its id cannot be
+        # reused by another frame while the entry exists
+        self._context_cache[cache_key] = (test_set, df_context)
+        return df_context
 
     def predict_from_last_window_one_pass(
         self,
@@ -282,9 +323,11 @@ class ModelPipeline(_ModelListMixin):
         freq: str,
         h: int,
         mode: str = "in_domain",
+        plot: bool = True,
     ) -> pd.DataFrame:
         """
         Predicts exactly the last horizon h points for each test series in a single pass.
+        Set plot=False to skip the diagnostic predicted-vs-original figure.
         """
         model_name = str(model.models[0])
 
@@ -318,10 +361,13 @@ class ModelPipeline(_ModelListMixin):
 
             df_y_hat_raw = model.predict(df=df_y_preprocess, freq=freq)
 
-            df_y_hat = df_y_hat_raw.groupby(
-                "unique_id", group_keys=True, as_index=False
-            ).apply(lambda g: self._mark_prediction_rows(group=g, horizon=window_size))
-            df_y_hat = df_y_hat.reset_index(drop=True)
+            # keep the first window_size forecast rows of every series in one
+            # vectorized pass instead of a python call per group
+            df_y_hat = (
+                df_y_hat_raw.groupby("unique_id", sort=False, observed=True)
+                .head(window_size)
+                .reset_index(drop=True)
+            )
 
             df_y_hat.sort_values(["unique_id", "ds"], inplace=True)
 
@@ -345,27 +391,27 @@ class ModelPipeline(_ModelListMixin):
 
         df_y_hat.rename(columns={model_name: "y"}, inplace=True)
         df_y_hat["y"] = df_y_hat["y"].clip(lower=0)
-        df_y_hat = df_y_hat.groupby("unique_id", group_keys=False).tail(h)
+        df_y_hat = df_y_hat.groupby("unique_id", sort=False, group_keys=False).tail(h)
 
         if "y_true" in df_y.columns:
             df_y = df_y.rename(columns={"y_true": "y"})
 
-        suffix_name = f"{model_name}-last-window-one-pass_{mode}_{dataset_desc}"
-        title = (
-            f"{model_name} • Last-window one-pass ({mode.replace('_', ' ')}) — "
-            f"{dataset_name_for_title} [{dataset_group_for_title}]"
-        )
-
-        plot_generated_vs_original(
-            synth_data=df_y_hat[["unique_id", "ds", "y"]],
-            original_data=df_y[["unique_id", "ds", "y"]],
-            dataset_name=dataset_name_for_title,
-            dataset_group=dataset_group_for_title,
-            model_name=model_name,
-            n_series=8,
-            suffix_name=suffix_name,
-            title=title,
-        )
+        if plot:
+            suffix_name = f"{model_name}-last-window-one-pass_{mode}_{dataset_desc}"
+            title = (
+                f"{model_name} • Last-window one-pass ({mode.replace('_', ' ')}) — "
+                f"{dataset_name_for_title} [{dataset_group_for_title}]"
+            )
+            plot_generated_vs_original(
+                synth_data=df_y_hat[["unique_id", "ds", "y"]],
+                original_data=df_y[["unique_id", "ds", "y"]],
+                dataset_name=dataset_name_for_title,
+                dataset_group=dataset_group_for_title,
+                model_name=model_name,
+                n_series=8,
+                suffix_name=suffix_name,
+                title=title,
+            )
 
         df_y.rename(columns={"y": "y_true"}, inplace=True)
 
@@ -408,3 +454,6 @@ class ModelPipelineCoreset(ModelPipeline):
         self.test_long_basic_forecast = empty
 
         self.models = {}
+        # where each model in self.models is saved, so it can be reloaded
+        self.model_paths = {}
+        self._context_cache = {}
@@ -1,5 +1,5 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+# matplotlib and seaborn are imported by the plotting functions themselves,
+# so importing this module (and timegen.visualization) does not load them
 import numpy as np
 
 
@@ -13,6 +13,9 @@ def plot_series_comparisons(X_orig, X_timegen, X_benchmark, n_examples=4):
     - X_benchmark: numpy.ndarray, the dataset generated by benchmark transformation.
     - n_examples: int, the number of examples to plot.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     sns.set_style("whitegrid")
     plt.rcParams.update(
         {
@@ -81,6 +84,8 @@ def plot_transformations_comparison(transformed_datasets, X_orig, series):
     - sample_index: int, index of the sample to display from the transformed datasets.
     - n_features: int, index of the feature to plot from the datasets.
     """
+    import matplotlib.pyplot as plt
+
     transformations = ["Jitter", "Scaling", "Magnitude Warp", "Time Warp"]
     levels = ["Level 0", "Level 1", "Level 2", "Level 3", "Level 4", "Level 5"]
 
@@ -124,6 +129,9 @@ def plot_long_tail_comparisons(
     - distances: numpy.ndarray, distances used for sorting and selecting the long tail.
     - top_n: int, number of top series to plot from the long tail.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     sns.set_style("whitegrid")
     plt.rcParams.update(
         {
@@ -211,6 +219,8 @@ def plot_transformations_with_generate_datasets(
     - transformations: List of dictionaries with transformation details.
     - num_series: Number of time series to plot.
     """
+    import matplotlib.pyplot as plt
+
     nrows = num_series
     ncols = 2 * len(transformations)
     fig, axs = plt.subplots(
@@ -1,10 +1,13 @@
+# matplotlib is imported by the plotting functions, so the pipelines that
+# import this module do not pay for it when plots are turned off
 import os
-import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
 
 
 def plot_loss(history_dict):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
 
     # Total Loss
@@ -47,10 +50,22 @@ def plot_generated_vs_original(
     formats: tuple[str, ...] = ("pdf",),
 ) -> None:
 
+    import matplotlib.pyplot as plt
+
     plt.style.use("bmh")
 
-    available = len(synth_data["unique_id"].unique())
-    n_series = min(n_series, available)
+    # split each frame by series once, instead of a mask scan per subplot;
+    # observed=True keeps unused categories of a categorical unique_id out
+    original_groups = dict(
+        list(original_data.groupby("unique_id", sort=False, observed=True)[["ds", "y"]])
+    )
+    synth_groups = dict(
+        list(synth_data.groupby("unique_id", sort=False, observed=True)[["ds", "y"]])
+    )
+    empty = original_data.iloc[:0][["ds", "y"]]
+
+    # the groups keep the order in which series appear, as unique() did
+    n_series = min(n_series, len(synth_groups))
     if n_series % 2:  # make it even
         n_series -= 1
 
@@ -58,21 +73,16 @@ def plot_generated_vs_original(
     fig, axes = plt.subplots(n_rows, 2, figsize=(18, 10), sharex=False, sharey=False)
     axes = axes.ravel()
 
-    unique_ids = synth_data["unique_id"].unique()[:n_series]
+    unique_ids = list(synth_groups)[:n_series]
 
     for i, ts_id in enumerate(unique_ids):
         ax = axes[i]
 
-        ax.plot(
-            original_data.loc[original_data["unique_id"] == ts_id, "ds"],
-            original_data.loc[original_data["unique_id"] == ts_id, "y"],
-            label="Original",
-        )
-        ax.plot(
-            synth_data.loc[synth_data["unique_id"] == ts_id, "ds"],
-            synth_data.loc[synth_data["unique_id"] == ts_id, "y"],
-            label="Generated",
-        )
+        original = original_groups.get(ts_id, empty)
+        synth = synth_groups[ts_id]
+        # plain arrays skip matplotlib's pandas unit conversion
+        ax.plot(original["ds"].to_numpy(), original["y"].to_numpy(), label="Original")
+        ax.plot(synth["ds"].to_numpy(), synth["y"].to_numpy(), label="Generated")
 
         ax.set_title(f"Series: {ts_id}", fontsize=11, fontweight="bold")
         ax.set_xlabel("Date", fontsize=9)